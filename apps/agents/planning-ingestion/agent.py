@@ -5,8 +5,13 @@ Google ADK agent for crawling Milwaukee planning documents.
 """
 
 import asyncio
+import os
+import pickle
+from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
+import httpx
 from google.adk import Agent
 from google.adk.tools import FunctionTool
 
@@ -15,15 +20,28 @@ from config import (
     PlanningSource,
     SyncFrequency,
     ContentType,
+    get_source_by_id,
+    get_sources_by_frequency,
     load_env_config,
     FILE_SEARCH_STORE_DISPLAY_NAME,
 )
 from convex_client import ConvexHTTPClient, compute_content_hash
+from observability import get_observability_manager
 from tools.playwright_scraper import PlaywrightScraper
 from tools.gemini_filesearch import GeminiFileSearchTool
 
+# Local cache of {source_id: content_hash} from the previous run, so warm
+# cron runs can skip the remote hash check for unchanged sources
+HASH_CACHE_PATH = Path.home() / ".cache" / "mkedev" / "planning_hashes.pickle"
 
-@dataclass
+# Hard ceiling per source so one hung scrape can't stall a whole batch
+SOURCE_TIMEOUT_SECONDS = 120.0
+
+# Default fanout for batch syncs, overridable per deployment
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("PLANNING_MAX_CONCURRENCY", "4"))
+
+
+@dataclass(frozen=True, slots=True)
 class SyncResult:
     """Result of syncing a single document."""
     source_id: str
@@ -32,7 +50,7 @@ class SyncResult:
     message: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncSummary:
     """Summary of a sync run."""
     total: int
@@ -43,6 +61,19 @@ class SyncSummary:
     results: list[SyncResult]
 
 
+def _summarize(results: list[SyncResult]) -> SyncSummary:
+    """Build a SyncSummary from per-source results in a single pass."""
+    counts = Counter(r.action for r in results)
+    return SyncSummary(
+        total=len(results),
+        created=counts["created"],
+        updated=counts["updated"],
+        skipped=counts["skipped"],
+        failed=counts["error"],
+        results=results,
+    )
+
+
 class PlanningIngestionAgent:
     """
     Agent for crawling and indexing Milwaukee planning documents.
@@ -63,8 +94,18 @@ class PlanningIngestionAgent:
         gemini_api_key: str,
         convex_url: str,
         convex_deploy_key: str,
+        store_name: Optional[str] = None,
     ):
-        """Initialize the agent with API credentials."""
+        """
+        Initialize the agent with API credentials.
+
+        Args:
+            gemini_api_key: Google Gemini API key
+            convex_url: Convex deployment URL
+            convex_deploy_key: Convex deploy key
+            store_name: Pre-resolved Gemini File Search Store name; when
+                given, the store-existence lookup on first upload is skipped
+        """
         self.gemini_api_key = gemini_api_key
         self.convex_url = convex_url
         self.convex_deploy_key = convex_deploy_key
@@ -74,13 +115,47 @@ class PlanningIngestionAgent:
         self.gemini_fs = GeminiFileSearchTool(gemini_api_key)
         self.convex = ConvexHTTPClient(convex_url, convex_deploy_key)
 
-        # File Search Store name (cached after first creation)
-        self._store_name: Optional[str] = None
+        # Lightweight HTTP client for conditional (304) pre-checks
+        self._http = httpx.AsyncClient(timeout=15.0, follow_redirects=True)
+
+        # Content hashes seen on previous runs (best-effort; missing or
+        # corrupt cache files just mean a cold start)
+        self._hash_cache: dict[str, str] = self._load_hash_cache()
+
+        # File Search Store name (cached after first creation); the lock
+        # keeps concurrent syncs from racing into duplicate lookups
+        self._store_name: Optional[str] = store_name
+        self._store_lock = asyncio.Lock()
+
+    @staticmethod
+    def _load_hash_cache() -> dict[str, str]:
+        """Load the persisted content-hash cache from the previous run."""
+        try:
+            with open(HASH_CACHE_PATH, "rb") as f:
+                cache = pickle.load(f)
+            if isinstance(cache, dict):
+                return cache
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+        return {}
+
+    def _flush_hash_cache(self) -> None:
+        """Persist the content-hash cache for the next run."""
+        try:
+            HASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(HASH_CACHE_PATH, "wb") as f:
+                pickle.dump(self._hash_cache, f)
+        except OSError:
+            pass  # cache is an optimization, never fail the sync over it
 
     async def close(self):
         """Clean up resources."""
+        self._flush_hash_cache()
         await self.scraper.close()
         await self.convex.close()
+        await self._http.aclose()
+        # Drain any trace payloads still buffered in the batcher
+        await get_observability_manager().aclose()
 
     async def __aenter__(self):
         return self
@@ -91,15 +166,56 @@ class PlanningIngestionAgent:
     async def _get_store_name(self) -> str:
         """Get or create the File Search Store."""
         if self._store_name is None:
-            self._store_name, _ = await self.gemini_fs.get_or_create_store(
-                FILE_SEARCH_STORE_DISPLAY_NAME
-            )
+            async with self._store_lock:
+                if self._store_name is None:
+                    self._store_name, _ = await self.gemini_fs.get_or_create_store(
+                        FILE_SEARCH_STORE_DISPLAY_NAME
+                    )
         return self._store_name
 
+    async def _is_not_modified(
+        self,
+        source: PlanningSource,
+        prefetched: Optional[dict] = None,
+    ) -> bool:
+        """
+        Check whether a source is unchanged via a conditional HEAD request.
+
+        Uses the ETag / Last-Modified validators stored in Convex from the
+        previous successful sync (taken from the batch-prefetched row when
+        available). Returns False (i.e. proceed with the scrape) when no
+        validators are stored or the check itself fails.
+        """
+        if prefetched is not None:
+            cached = {
+                "etag": prefetched.get("etag"),
+                "last_modified": prefetched.get("lastModified"),
+            }
+        else:
+            try:
+                cached = await self.convex.get_cache_headers(source.id)
+            except Exception:
+                return False
+
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        if not headers:
+            return False
+
+        try:
+            response = await self._http.head(source.url, headers=headers)
+            return response.status_code == 304
+        except httpx.HTTPError:
+            return False
+
     async def sync_source(
         self,
         source: PlanningSource,
         force: bool = False,
+        prefetched: Optional[dict] = None,
     ) -> SyncResult:
         """
         Sync a single source.
@@ -107,11 +223,26 @@ class PlanningIngestionAgent:
         Args:
             source: Source configuration
             force: Force re-sync even if content hasn't changed
+            prefetched: Batch-prefetched Convex row for this source
+                ({contentHash, status, etag, lastModified}; empty dict if
+                the document doesn't exist). When given, the per-source
+                hash/cache-header round-trips are skipped.
 
         Returns:
             SyncResult with action taken
         """
         try:
+            # Step 0: Conditional pre-check — if the server says the
+            # resource hasn't changed since the last sync, skip the
+            # expensive browser scrape entirely.
+            if not force and await self._is_not_modified(source, prefetched):
+                return SyncResult(
+                    source_id=source.id,
+                    success=True,
+                    action="skipped",
+                    message="Not modified (304)",
+                )
+
             # Step 1: Scrape content
             if source.content_type == ContentType.HTML:
                 result = await self.scraper.scrape_page(source.url)
@@ -134,16 +265,39 @@ class PlanningIngestionAgent:
                     message=result.error,
                 )
 
-            # Step 2: Compute content hash
-            content_hash = compute_content_hash(result.markdown or "")
+            # Step 2: Compute content hash (PDF downloads hash while
+            # streaming, so reuse that digest when present)
+            content_hash = result.content_hash or compute_content_hash(
+                result.pdf_bytes or result.markdown or ""
+            )
 
             # Step 3: Check if content changed
+            existed: Optional[bool] = None
             if not force:
-                hash_check = await self.convex.check_content_hash(
-                    source_id=source.id,
-                    content_hash=content_hash,
-                )
-                if hash_check.get("exists") and not hash_check.get("changed"):
+                # Check the local cache first — on warm cron runs this
+                # answers "unchanged" without any Convex traffic
+                if self._hash_cache.get(source.id) == content_hash:
+                    return SyncResult(
+                        source_id=source.id,
+                        success=True,
+                        action="skipped",
+                        message="Content unchanged (local cache)",
+                    )
+                if prefetched is not None:
+                    # Answer locally from the batch-prefetched row
+                    existed = bool(prefetched)
+                    unchanged = (
+                        existed and prefetched.get("contentHash") == content_hash
+                    )
+                else:
+                    hash_check = await self.convex.check_content_hash(
+                        source_id=source.id,
+                        content_hash=content_hash,
+                    )
+                    existed = bool(hash_check.get("exists"))
+                    unchanged = existed and not hash_check.get("changed")
+                if unchanged:
+                    self._hash_cache[source.id] = content_hash
                     return SyncResult(
                         source_id=source.id,
                         success=True,
@@ -152,7 +306,7 @@ class PlanningIngestionAgent:
                     )
 
             # Step 4: Upsert to Convex
-            await self.convex.upsert_document(
+            upsert_result = await self.convex.upsert_document(
                 source_id=source.id,
                 source_url=source.url,
                 title=result.title or source.title,
@@ -162,19 +316,17 @@ class PlanningIngestionAgent:
                 content_hash=content_hash,
                 status="crawled",
                 markdown_content=result.markdown,
+                etag=result.etag,
+                last_modified=result.last_modified,
             )
 
             # Step 5: Upload to Gemini File Search
             store_name = await self._get_store_name()
 
-            # Check if this is PDF content (base64 encoded)
-            if result.markdown and result.markdown.startswith("PDF_BASE64:"):
-                import base64
-                pdf_base64 = result.markdown[len("PDF_BASE64:"):]
-                pdf_bytes = base64.b64decode(pdf_base64)
+            if result.pdf_bytes is not None:
                 upload_result = await self.gemini_fs.upload_pdf(
                     store_name=store_name,
-                    pdf_content=pdf_bytes,
+                    pdf_content=result.pdf_bytes,
                     display_name=f"{source.category}/{source.id}.pdf",
                     metadata={
                         "source_id": source.id,
@@ -214,9 +366,16 @@ class PlanningIngestionAgent:
                 gemini_file_uri=upload_result.file_uri,
             )
 
-            # Determine action
-            existing = await self.convex.get_document(source.id)
-            action = "updated" if existing else "created"
+            # Remember the hash so the next run can skip this source locally
+            self._hash_cache[source.id] = content_hash
+
+            # Determine action without another round-trip: prefer the
+            # mutation's own created flag, then fall back to what the
+            # hash check told us before the upsert.
+            created = upsert_result.get("created")
+            if created is None:
+                created = existed is False
+            action = "created" if created else "updated"
 
             return SyncResult(
                 source_id=source.id,
@@ -226,10 +385,15 @@ class PlanningIngestionAgent:
             )
 
         except Exception as e:
-            await self.convex.update_status(
-                source_id=source.id,
-                status="error",
-                error_message=str(e),
+            # Shield the status write so a cancellation arriving mid-sync
+            # still records the error state instead of leaving the
+            # document stuck in "crawled"
+            await asyncio.shield(
+                self.convex.update_status(
+                    source_id=source.id,
+                    status="error",
+                    error_message=str(e),
+                )
             )
             return SyncResult(
                 source_id=source.id,
@@ -238,10 +402,80 @@ class PlanningIngestionAgent:
                 message=str(e),
             )
 
+    async def _sync_many(
+        self,
+        sources: list[PlanningSource],
+        force: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> list[SyncResult]:
+        """
+        Sync multiple sources concurrently.
+
+        Each sync is dominated by network I/O (scrape, Convex round-trips,
+        Gemini upload), so sources run in parallel, capped by a semaphore
+        to avoid overloading the Gemini/Convex endpoints.
+
+        Args:
+            sources: Sources to sync
+            force: Force re-sync even if content hasn't changed
+            max_concurrency: Maximum number of sources synced at once
+
+        Returns:
+            List of SyncResults in the same order as sources
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        # One batch round-trip for every source's hash/status row instead
+        # of 2 Convex calls per source inside the sweep
+        prefetched_map: Optional[dict[str, dict]] = None
+        if not force:
+            try:
+                prefetched_map = await self.convex.list_hashes(
+                    [s.id for s in sources]
+                )
+            except Exception:
+                prefetched_map = None  # fall back to per-source checks
+
+        async def _guarded(source: PlanningSource) -> SyncResult:
+            async with sem:
+                prefetched = (
+                    prefetched_map.get(source.id, {})
+                    if prefetched_map is not None
+                    else None
+                )
+                try:
+                    async with asyncio.timeout(SOURCE_TIMEOUT_SECONDS):
+                        return await self.sync_source(
+                            source, force=force, prefetched=prefetched
+                        )
+                except TimeoutError:
+                    return SyncResult(
+                        source_id=source.id,
+                        success=False,
+                        action="error",
+                        message=f"Timed out after {SOURCE_TIMEOUT_SECONDS:.0f}s",
+                    )
+                except Exception as e:
+                    return SyncResult(
+                        source_id=source.id,
+                        success=False,
+                        action="error",
+                        message=str(e),
+                    )
+
+        # Structured concurrency: on cancellation (e.g. Ctrl-C) the group
+        # tears down every in-flight sync — no orphaned Playwright pages
+        # or half-finished Convex writes left behind
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_guarded(s)) for s in sources]
+
+        return [task.result() for task in tasks]
+
     async def sync_by_frequency(
         self,
         frequency: SyncFrequency,
         force: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ) -> SyncSummary:
         """
         Sync all sources with a specific frequency.
@@ -249,50 +483,36 @@ class PlanningIngestionAgent:
         Args:
             frequency: SyncFrequency.WEEKLY or SyncFrequency.MONTHLY
             force: Force re-sync even if content hasn't changed
+            max_concurrency: Maximum number of sources synced at once
 
         Returns:
             SyncSummary with results
         """
-        sources = [s for s in PLANNING_SOURCES if s.sync_frequency == frequency]
-        results = []
-
-        for source in sources:
-            result = await self.sync_source(source, force=force)
-            results.append(result)
-
-        return SyncSummary(
-            total=len(results),
-            created=sum(1 for r in results if r.action == "created"),
-            updated=sum(1 for r in results if r.action == "updated"),
-            skipped=sum(1 for r in results if r.action == "skipped"),
-            failed=sum(1 for r in results if r.action == "error"),
-            results=results,
+        sources = get_sources_by_frequency(frequency)
+        results = await self._sync_many(
+            sources, force=force, max_concurrency=max_concurrency
         )
+        return _summarize(results)
 
-    async def sync_all(self, force: bool = False) -> SyncSummary:
+    async def sync_all(
+        self,
+        force: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> SyncSummary:
         """
         Sync all sources.
 
         Args:
             force: Force re-sync even if content hasn't changed
+            max_concurrency: Maximum number of sources synced at once
 
         Returns:
             SyncSummary with results
         """
-        results = []
-
-        for source in PLANNING_SOURCES:
-            result = await self.sync_source(source, force=force)
-            results.append(result)
-
-        return SyncSummary(
-            total=len(results),
-            created=sum(1 for r in results if r.action == "created"),
-            updated=sum(1 for r in results if r.action == "updated"),
-            skipped=sum(1 for r in results if r.action == "skipped"),
-            failed=sum(1 for r in results if r.action == "error"),
-            results=results,
+        results = await self._sync_many(
+            PLANNING_SOURCES, force=force, max_concurrency=max_concurrency
         )
+        return _summarize(results)
 
     async def sync_single(
         self,
@@ -309,7 +529,7 @@ class PlanningIngestionAgent:
         Returns:
             SyncResult
         """
-        source = next((s for s in PLANNING_SOURCES if s.id == source_id), None)
+        source = get_source_by_id(source_id)
         if not source:
             return SyncResult(
                 source_id=source_id,
@@ -336,4 +556,5 @@ def create_agent() -> PlanningIngestionAgent:
         gemini_api_key=config.gemini_api_key,
         convex_url=config.convex_url,
         convex_deploy_key=config.convex_deploy_key,
+        store_name=config.gemini_store_name,
     )
@@ -4,10 +4,11 @@ Planning Ingestion Agent Configuration
 Target URLs and crawl frequencies for Milwaukee planning documents.
 """
 
+import functools
+import os
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,7 +26,7 @@ class ContentType(Enum):
     PDF = "pdf"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlanningSource:
     """Configuration for a planning document source."""
     id: str
@@ -153,22 +154,34 @@ PLANNING_SOURCES: list[PlanningSource] = [
 ]
 
 
+# Precomputed lookup indexes — PLANNING_SOURCES is fixed at import time,
+# so the per-call linear scans are replaced with O(1) dict lookups
+SOURCES_BY_ID: dict[str, PlanningSource] = {s.id: s for s in PLANNING_SOURCES}
+
+SOURCES_BY_FREQUENCY: dict[SyncFrequency, list[PlanningSource]] = {
+    frequency: [s for s in PLANNING_SOURCES if s.sync_frequency is frequency]
+    for frequency in SyncFrequency
+}
+
+SOURCES_BY_CONTENT_TYPE: dict[ContentType, list[PlanningSource]] = {
+    content_type: [s for s in PLANNING_SOURCES if s.content_type is content_type]
+    for content_type in ContentType
+}
+
+
 def get_sources_by_frequency(frequency: SyncFrequency) -> list[PlanningSource]:
     """Get all sources matching a sync frequency."""
-    return [s for s in PLANNING_SOURCES if s.sync_frequency == frequency]
+    return SOURCES_BY_FREQUENCY[frequency]
 
 
 def get_sources_by_content_type(content_type: ContentType) -> list[PlanningSource]:
     """Get all sources matching a content type."""
-    return [s for s in PLANNING_SOURCES if s.content_type == content_type]
+    return SOURCES_BY_CONTENT_TYPE[content_type]
 
 
 def get_source_by_id(source_id: str) -> Optional[PlanningSource]:
     """Get a specific source by ID."""
-    for source in PLANNING_SOURCES:
-        if source.id == source_id:
-            return source
-    return None
+    return SOURCES_BY_ID.get(source_id)
 
 
 # =============================================================================
@@ -182,13 +195,21 @@ class EnvConfig:
     convex_url: str
     convex_deploy_key: str
     firecrawl_api_key: Optional[str] = None  # Optional - only needed if using Firecrawl
+    gemini_store_name: Optional[str] = None  # Optional - skips store lookup when set
     opik_api_key: Optional[str] = None
     opik_workspace: Optional[str] = None
     opik_project_name: str = "mkedev-planning-ingestion"
 
 
+@functools.lru_cache(maxsize=1)
 def load_env_config() -> EnvConfig:
-    """Load and validate environment configuration."""
+    """
+    Load and validate environment configuration.
+
+    Cached after the first call — env vars don't change intra-process,
+    so schedulers that create an agent per job don't re-run the parse
+    and validation every time.
+    """
     gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")
     if not gemini_key:
         raise ValueError("GEMINI_API_KEY or GOOGLE_GEMINI_API_KEY is required")
@@ -206,6 +227,7 @@ def load_env_config() -> EnvConfig:
         convex_url=convex_url,
         convex_deploy_key=convex_key,
         firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY"),  # Optional
+        gemini_store_name=os.getenv("GEMINI_FILE_SEARCH_STORE_NAME"),  # Optional
         opik_api_key=os.getenv("OPIK_API_KEY"),
         opik_workspace=os.getenv("OPIK_WORKSPACE"),
         opik_project_name=os.getenv("OPIK_PROJECT_NAME", "mkedev-planning-ingestion"),
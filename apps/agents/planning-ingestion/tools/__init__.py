@@ -2,10 +2,13 @@
 Planning Ingestion Agent Tools
 
 Tools for web scraping, Gemini File Search, and Convex operations.
+
+Submodules are imported lazily (PEP 562) — they pull in heavy SDKs
+(google.adk, google.genai, playwright), which the CLI's `list` and
+`--dry-run` paths never need.
 """
 
-from .firecrawl_tool import FirecrawlTool, ScrapeResult
-from .gemini_filesearch import GeminiFileSearchTool, UploadResult
+from typing import Any
 
 __all__ = [
     "FirecrawlTool",
@@ -13,3 +16,26 @@ __all__ = [
     "GeminiFileSearchTool",
     "UploadResult",
 ]
+
+_EXPORTS = {
+    "FirecrawlTool": "firecrawl_tool",
+    "ScrapeResult": "firecrawl_tool",
+    "GeminiFileSearchTool": "gemini_filesearch",
+    "UploadResult": "gemini_filesearch",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # cache so __getattr__ only runs once
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -6,12 +6,24 @@ Web scraping tool using Firecrawl API for HTML and PDF content.
 
 import asyncio
 import httpx
+import random
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
 from google.adk.tools import ToolContext
 
+from ratelimit import AsyncTokenBucket
 
-@dataclass
+# Prefer orjson for decoding Firecrawl responses — PDF-extracted
+# markdown payloads run to multiple MB and orjson parses them several
+# times faster than stdlib json. Optional; fall back silently.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+@dataclass(slots=True)
 class ScrapeResult:
     """Result from scraping a URL."""
     url: str
@@ -31,7 +43,7 @@ class FirecrawlTool:
 
     BASE_URL = "https://api.firecrawl.dev/v1"
     MAX_RETRIES = 3
-    RATE_LIMIT_DELAY = 6.0  # 10 requests per minute = 6 seconds between requests
+    CACHE_MAX_ENTRIES = 1024
 
     def __init__(self, api_key: str):
         """
@@ -41,18 +53,90 @@ class FirecrawlTool:
             api_key: Firecrawl API key
         """
         self.api_key = api_key
+        # HTTP/2 + keep-alive pool so repeated scrapes multiplex over
+        # warm connections instead of re-handshaking per request
         self.client = httpx.AsyncClient(
+            http2=True,
             timeout=60.0,  # Longer timeout for PDF processing
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+            ),
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
             },
         )
-        self._last_request_time = 0
+        # Firecrawl allows 10 requests/minute; a token bucket lets short
+        # bursts proceed immediately instead of forcing a fixed 6s gap
+        # between every pair of requests
+        self._limiter = AsyncTokenBucket(rate=10, period=60.0)
+        # Separate client for direct PDF downloads — must not carry the
+        # Firecrawl Authorization header to arbitrary hosts
+        self._download_client = httpx.AsyncClient(
+            timeout=60.0,
+            follow_redirects=True,
+        )
+        # LRU of successful scrapes keyed by URL. Firecrawl's POST API
+        # doesn't expose conditional GETs against the target, so re-runs
+        # within a process are served from here instead of re-fetching
+        # and re-parsing identical URLs. Keys are "html:<url>" or
+        # "pdf:<url>" since both paths hit the same /scrape endpoint.
+        self._cache: OrderedDict[str, ScrapeResult] = OrderedDict()
+        # In-flight scrapes by cache key: concurrent callers for the
+        # same URL await one shared future instead of issuing duplicate
+        # API requests
+        self._inflight: dict[str, "asyncio.Future[ScrapeResult]"] = {}
+
+    async def _single_flight(self, key: str, fetch) -> ScrapeResult:
+        """
+        Deduplicate concurrent scrapes of the same key.
+
+        The first caller runs `fetch` and resolves a shared future;
+        callers arriving while it is in flight await that future.
+        """
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await existing
+
+        future: "asyncio.Future[ScrapeResult]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # consumed here even with no waiters
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _cache_get(self, key: str) -> Optional[ScrapeResult]:
+        """Return a cached scrape result, refreshing its LRU position."""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: str, result: ScrapeResult) -> None:
+        """Cache a successful scrape result, evicting the oldest entry."""
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
 
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP clients."""
         await self.client.aclose()
+        await self._download_client.aclose()
 
     async def __aenter__(self):
         return self
@@ -60,15 +144,6 @@ class FirecrawlTool:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
 
-    async def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        import time
-        now = time.time()
-        elapsed = now - self._last_request_time
-        if elapsed < self.RATE_LIMIT_DELAY:
-            await asyncio.sleep(self.RATE_LIMIT_DELAY - elapsed)
-        self._last_request_time = time.time()
-
     async def _retry_request(
         self,
         method: str,
@@ -83,12 +158,15 @@ class FirecrawlTool:
 
         for attempt in range(max_retries):
             try:
-                await self._rate_limit()
-                response = await self.client.request(method, url, **kwargs)
+                async with self._limiter:
+                    response = await self.client.request(method, url, **kwargs)
 
                 # Handle rate limiting
                 if response.status_code == 429:
                     retry_after = int(response.headers.get("Retry-After", 60))
+                    # Hold the shared bucket so concurrent callers back
+                    # off together instead of piling on more 429s
+                    self._limiter.penalize(retry_after)
                     await asyncio.sleep(retry_after)
                     continue
 
@@ -101,8 +179,11 @@ class FirecrawlTool:
             except httpx.RequestError as e:
                 last_error = e
 
+            # Full-jitter backoff (capped at 30s) — deterministic 2**n
+            # delays make concurrent failures retry in lock-step and
+            # re-collide on the rate limit
             if attempt < max_retries - 1:
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(random.uniform(0, min(2 ** attempt, 30.0)))
 
         raise last_error
 
@@ -110,12 +191,21 @@ class FirecrawlTool:
         """
         Scrape an HTML page and convert to markdown.
 
+        Cached and deduplicated: concurrent calls for the same URL
+        share one in-flight request.
+
         Args:
             url: URL to scrape
 
         Returns:
             ScrapeResult with markdown content
         """
+        return await self._single_flight(
+            f"html:{url}", lambda: self._scrape_page(url)
+        )
+
+    async def _scrape_page(self, url: str) -> ScrapeResult:
+        """Issue the actual /scrape request for an HTML page."""
         try:
             response = await self._retry_request(
                 "POST",
@@ -127,7 +217,7 @@ class FirecrawlTool:
                 },
             )
 
-            data = response.json()
+            data = _json_loads(response.content)
 
             if not data.get("success"):
                 return ScrapeResult(
@@ -140,26 +230,34 @@ class FirecrawlTool:
             markdown = scrape_data.get("markdown", "")
             title = scrape_data.get("metadata", {}).get("title", "")
 
-            # Validate content
-            if not markdown or len(markdown.strip()) < 50:
+            # Validate content — length guard plus isspace(), which
+            # scans without materializing a stripped copy
+            if not markdown or len(markdown) < 50 or markdown.isspace():
                 return ScrapeResult(
                     url=url,
                     success=False,
                     error="Scraped content too short or empty",
                 )
 
-            return ScrapeResult(
+            result = ScrapeResult(
                 url=url,
                 success=True,
                 markdown=markdown,
                 title=title,
             )
+            self._cache_put(f"html:{url}", result)
+            return result
 
         except httpx.HTTPStatusError as e:
             return ScrapeResult(
                 url=url,
                 success=False,
-                error=f"HTTP {e.response.status_code}: {e.response.text[:200]}",
+                # Decode only the slice we keep — .text would decode the
+                # entire error body just to throw most of it away
+                error=(
+                    f"HTTP {e.response.status_code}: "
+                    f"{e.response.content[:200].decode('utf-8', 'replace')}"
+                ),
             )
         except Exception as e:
             return ScrapeResult(
@@ -172,12 +270,21 @@ class FirecrawlTool:
         """
         Scrape a PDF document and extract text as markdown.
 
+        Cached and deduplicated: concurrent calls for the same URL
+        share one in-flight request.
+
         Args:
             url: URL of the PDF
 
         Returns:
             ScrapeResult with markdown content extracted from PDF
         """
+        return await self._single_flight(
+            f"pdf:{url}", lambda: self._scrape_pdf(url)
+        )
+
+    async def _scrape_pdf(self, url: str) -> ScrapeResult:
+        """Issue the actual /scrape request for a PDF document."""
         try:
             response = await self._retry_request(
                 "POST",
@@ -189,7 +296,7 @@ class FirecrawlTool:
                 },
             )
 
-            data = response.json()
+            data = _json_loads(response.content)
 
             if not data.get("success"):
                 return ScrapeResult(
@@ -203,26 +310,33 @@ class FirecrawlTool:
             metadata = scrape_data.get("metadata", {})
             title = metadata.get("title") or metadata.get("pdf_title", "")
 
-            # Validate content
-            if not markdown or len(markdown.strip()) < 100:
+            # Validate content — length guard plus allocation-free isspace()
+            if not markdown or len(markdown) < 100 or markdown.isspace():
                 return ScrapeResult(
                     url=url,
                     success=False,
                     error="PDF content extraction too short or empty",
                 )
 
-            return ScrapeResult(
+            result = ScrapeResult(
                 url=url,
                 success=True,
                 markdown=markdown,
                 title=title,
             )
+            self._cache_put(f"pdf:{url}", result)
+            return result
 
         except httpx.HTTPStatusError as e:
             return ScrapeResult(
                 url=url,
                 success=False,
-                error=f"HTTP {e.response.status_code}: {e.response.text[:200]}",
+                # Decode only the slice we keep — .text would decode the
+                # entire error body just to throw most of it away
+                error=(
+                    f"HTTP {e.response.status_code}: "
+                    f"{e.response.content[:200].decode('utf-8', 'replace')}"
+                ),
             )
         except Exception as e:
             return ScrapeResult(
@@ -242,9 +356,11 @@ class FirecrawlTool:
             ScrapeResult with pdf_content bytes
         """
         try:
-            # Direct download without Firecrawl
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.get(url, follow_redirects=True)
+            # Direct download without Firecrawl; stream the body so
+            # large PDFs don't get double-buffered inside httpx, and
+            # non-PDF responses are rejected from headers alone without
+            # consuming the body
+            async with self._download_client.stream("GET", url) as response:
                 response.raise_for_status()
 
                 content_type = response.headers.get("content-type", "")
@@ -255,11 +371,15 @@ class FirecrawlTool:
                         error=f"Not a PDF: {content_type}",
                     )
 
-                return ScrapeResult(
-                    url=url,
-                    success=True,
-                    pdf_content=response.content,
-                )
+                buf = bytearray()
+                async for chunk in response.aiter_bytes(65536):
+                    buf.extend(chunk)
+
+            return ScrapeResult(
+                url=url,
+                success=True,
+                pdf_content=bytes(buf),
+            )
 
         except Exception as e:
             return ScrapeResult(
@@ -273,6 +393,30 @@ class FirecrawlTool:
 # ADK Tool Functions
 # =============================================================================
 
+# Long-lived FirecrawlTool instances shared across tool calls so every
+# scrape reuses one connection pool instead of paying a fresh TLS
+# handshake per call (ADK session state only holds serializable values,
+# so live clients are cached here, keyed by API key)
+_shared_tools: dict[str, FirecrawlTool] = {}
+
+
+def get_shared_firecrawl(api_key: str) -> FirecrawlTool:
+    """Get (or lazily create) the shared FirecrawlTool for an API key."""
+    tool = _shared_tools.get(api_key)
+    if tool is None:
+        tool = FirecrawlTool(api_key)
+        _shared_tools[api_key] = tool
+    return tool
+
+
+async def aclose_shared_firecrawl():
+    """Close all shared FirecrawlTool instances (call at shutdown)."""
+    tools = list(_shared_tools.values())
+    _shared_tools.clear()
+    for tool in tools:
+        await tool.close()
+
+
 async def scrape_html_page(
     url: str,
     tool_context: ToolContext,
@@ -291,14 +435,14 @@ async def scrape_html_page(
     if not api_key:
         return {"success": False, "error": "Firecrawl API key not configured"}
 
-    async with FirecrawlTool(api_key) as firecrawl:
-        result = await firecrawl.scrape_page(url)
-        return {
-            "success": result.success,
-            "markdown": result.markdown,
-            "title": result.title,
-            "error": result.error,
-        }
+    firecrawl = get_shared_firecrawl(api_key)
+    result = await firecrawl.scrape_page(url)
+    return {
+        "success": result.success,
+        "markdown": result.markdown,
+        "title": result.title,
+        "error": result.error,
+    }
 
 
 async def scrape_pdf_document(
@@ -319,11 +463,11 @@ async def scrape_pdf_document(
     if not api_key:
         return {"success": False, "error": "Firecrawl API key not configured"}
 
-    async with FirecrawlTool(api_key) as firecrawl:
-        result = await firecrawl.scrape_pdf(url)
-        return {
-            "success": result.success,
-            "markdown": result.markdown,
-            "title": result.title,
-            "error": result.error,
-        }
+    firecrawl = get_shared_firecrawl(api_key)
+    result = await firecrawl.scrape_pdf(url)
+    return {
+        "success": result.success,
+        "markdown": result.markdown,
+        "title": result.title,
+        "error": result.error,
+    }
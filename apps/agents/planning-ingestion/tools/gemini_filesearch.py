@@ -4,12 +4,59 @@ Gemini File Search Tool
 Upload documents to Gemini File Search Stores for RAG.
 """
 
+import asyncio
+import contextlib
+import hashlib
 import io
+import json
+import os
+import tempfile
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 from google import genai
 from google.genai import types
 
+from ratelimit import AsyncTokenBucket
+
+# Persisted upload dedup cache: content hash -> Gemini file URI, so
+# byte-identical documents skip the upload across runs too
+UPLOAD_CACHE_PATH = Path.home() / ".cache" / "mkedev" / "gemini_uploads.json"
+
+# Shared per-API-key instances: a genai.Client owns an HTTP connection
+# pool and cached auth, so constructing one per call pays a fresh TLS
+# handshake and token refresh every time
+_CLIENT_CACHE: dict[str, genai.Client] = {}
+_TOOL_CACHE: dict[str, "GeminiFileSearchTool"] = {}
+
+# Payloads above this go through a temp file so the SDK stream-reads
+# from disk instead of the heap holding the bytes twice (our buffer
+# plus the SDK's read-back)
+LARGE_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def _upload_source(payload: bytes):
+    """Yield a file argument for the SDK upload call.
+
+    Small payloads stay in memory as BytesIO; large ones are spilled
+    to a temp file (deleted afterwards) so only one copy of the bytes
+    lives in the Python heap during the upload.
+    """
+    if len(payload) <= LARGE_UPLOAD_THRESHOLD:
+        yield io.BytesIO(payload)
+        return
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".upload")
+    try:
+        tmp.write(payload)
+        tmp.close()
+        yield tmp.name
+    finally:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+
 
 @dataclass
 class UploadResult:
@@ -34,8 +81,51 @@ class GeminiFileSearchTool:
         Args:
             api_key: Google Gemini API key
         """
-        self.client = genai.Client(api_key=api_key)
+        if api_key not in _CLIENT_CACHE:
+            _CLIENT_CACHE[api_key] = genai.Client(api_key=api_key)
+        self.client = _CLIENT_CACHE[api_key]
         self._store_cache: dict[str, str] = {}  # display_name -> store_name
+        self._stores_prefetched = False
+        self._prefetch_lock = asyncio.Lock()
+        # Keeps concurrent uploads below the File Search API rate limits
+        self._limiter = AsyncTokenBucket(rate=2, period=1.0)
+        # "sha256:store_name" -> file_uri; a hash + dict lookup replaces
+        # a multi-second HTTPS upload for byte-identical payloads
+        self._upload_cache: dict[str, str] = self._load_upload_cache()
+
+    @staticmethod
+    def _load_upload_cache() -> dict[str, str]:
+        """Load the persisted upload dedup cache (best-effort)."""
+        try:
+            with open(UPLOAD_CACHE_PATH) as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _flush_upload_cache(self) -> None:
+        """Persist the upload dedup cache (best-effort)."""
+        try:
+            UPLOAD_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(UPLOAD_CACHE_PATH, "w") as f:
+                json.dump(self._upload_cache, f)
+        except OSError:
+            pass  # cache is an optimization, never fail an upload over it
+
+    def _cached_upload(
+        self, cache_key: str, display_name: str
+    ) -> Optional[UploadResult]:
+        """Return a dedup-cache hit as an UploadResult, if any."""
+        file_uri = self._upload_cache.get(cache_key)
+        if file_uri is None:
+            return None
+        return UploadResult(
+            success=True,
+            file_uri=file_uri,
+            document_name=display_name,
+        )
 
     async def get_or_create_store(
         self,
@@ -54,21 +144,32 @@ class GeminiFileSearchTool:
         if display_name in self._store_cache:
             return self._store_cache[display_name], False
 
-        # List existing stores
-        try:
-            stores = list(self.client.file_search_stores.list())
-            for store in stores:
-                if store.display_name == display_name:
-                    self._store_cache[display_name] = store.name
-                    return store.name, False
-        except Exception:
-            pass  # Store might not exist yet
+        # One-shot prefetch: a single list() populates the cache with
+        # every store instead of re-listing per distinct display_name.
+        # The lock keeps concurrent first callers from racing the RPC.
+        async with self._prefetch_lock:
+            if not self._stores_prefetched:
+                try:
+                    # The SDK is synchronous; drain the listing in a
+                    # worker thread so the loop keeps servicing uploads
+                    stores = await asyncio.to_thread(
+                        lambda: list(self.client.file_search_stores.list())
+                    )
+                    for store in stores:
+                        self._store_cache.setdefault(store.display_name, store.name)
+                    self._stores_prefetched = True
+                except Exception:
+                    pass  # No stores yet (or transient failure) — create below
+
+        if display_name in self._store_cache:
+            return self._store_cache[display_name], False
 
         # Create new store
-        store = self.client.file_search_stores.create(
+        store = await asyncio.to_thread(
+            self.client.file_search_stores.create,
             config=types.CreateFileSearchStoreConfig(
                 display_name=display_name,
-            )
+            ),
         )
         self._store_cache[display_name] = store.name
         return store.name, True
@@ -93,19 +194,27 @@ class GeminiFileSearchTool:
             UploadResult with file URI
         """
         try:
-            # Create a file-like object from content
+            # Hash inside the try: a bad payload type should surface as
+            # a failed UploadResult, the same as any other upload error
             content_bytes = content.encode("utf-8")
-            file_obj = io.BytesIO(content_bytes)
+            cache_key = f"{hashlib.sha256(content_bytes).hexdigest()}:{store_name}"
+            cached = self._cached_upload(cache_key, display_name)
+            if cached is not None:
+                return cached
+
+            await self._limiter.acquire()
 
             # Upload to store (note: custom_metadata not supported in current SDK)
-            result = self.client.file_search_stores.upload_to_file_search_store(
-                file=file_obj,
-                file_search_store_name=store_name,
-                config=types.UploadFileConfig(
-                    display_name=display_name,
-                    mime_type="text/markdown",
-                ),
-            )
+            with _upload_source(content_bytes) as file_obj:
+                result = await asyncio.to_thread(
+                    self.client.file_search_stores.upload_to_file_search_store,
+                    file=file_obj,
+                    file_search_store_name=store_name,
+                    config=types.UploadFileConfig(
+                        display_name=display_name,
+                        mime_type="text/markdown",
+                    ),
+                )
 
             # Check if operation completed with error
             if hasattr(result, 'error') and result.error:
@@ -119,6 +228,10 @@ class GeminiFileSearchTool:
             if hasattr(result, 'name'):
                 file_uri = result.name
 
+            if file_uri is not None:
+                self._upload_cache[cache_key] = file_uri
+                self._flush_upload_cache()
+
             return UploadResult(
                 success=True,
                 file_uri=file_uri,
@@ -151,18 +264,26 @@ class GeminiFileSearchTool:
             UploadResult with file URI
         """
         try:
-            # Create a file-like object from PDF bytes
-            file_obj = io.BytesIO(pdf_content)
+            # Hash inside the try: a bad payload type should surface as
+            # a failed UploadResult, the same as any other upload error
+            cache_key = f"{hashlib.sha256(pdf_content).hexdigest()}:{store_name}"
+            cached = self._cached_upload(cache_key, display_name)
+            if cached is not None:
+                return cached
+
+            await self._limiter.acquire()
 
             # Upload to store (note: custom_metadata not supported in current SDK)
-            result = self.client.file_search_stores.upload_to_file_search_store(
-                file=file_obj,
-                file_search_store_name=store_name,
-                config=types.UploadFileConfig(
-                    display_name=display_name,
-                    mime_type="application/pdf",
-                ),
-            )
+            with _upload_source(pdf_content) as file_obj:
+                result = await asyncio.to_thread(
+                    self.client.file_search_stores.upload_to_file_search_store,
+                    file=file_obj,
+                    file_search_store_name=store_name,
+                    config=types.UploadFileConfig(
+                        display_name=display_name,
+                        mime_type="application/pdf",
+                    ),
+                )
 
             # Check if operation completed with error
             if hasattr(result, 'error') and result.error:
@@ -176,6 +297,10 @@ class GeminiFileSearchTool:
             if hasattr(result, 'name'):
                 file_uri = result.name
 
+            if file_uri is not None:
+                self._upload_cache[cache_key] = file_uri
+                self._flush_upload_cache()
+
             return UploadResult(
                 success=True,
                 file_uri=file_uri,
@@ -241,6 +366,15 @@ class GeminiFileSearchTool:
 # Standalone Functions (for non-ADK usage)
 # =============================================================================
 
+def _get_shared_tool(api_key: str) -> "GeminiFileSearchTool":
+    """Get (or lazily create) the shared tool for an API key."""
+    tool = _TOOL_CACHE.get(api_key)
+    if tool is None:
+        tool = GeminiFileSearchTool(api_key)
+        _TOOL_CACHE[api_key] = tool
+    return tool
+
+
 async def upload_to_planning_store(
     api_key: str,
     content: str,
@@ -263,7 +397,7 @@ async def upload_to_planning_store(
     Returns:
         UploadResult
     """
-    tool = GeminiFileSearchTool(api_key)
+    tool = _get_shared_tool(api_key)
 
     # Get or create store
     store_name, _ = await tool.get_or_create_store(store_display_name)
@@ -275,3 +409,54 @@ async def upload_to_planning_store(
         return await tool.upload_pdf(store_name, content, display_name, metadata)
     else:
         return await tool.upload_markdown(store_name, content, display_name, metadata)
+
+
+async def upload_many_to_planning_store(
+    api_key: str,
+    items: list[dict],
+    store_display_name: str = "Milwaukee Planning Documents",
+    concurrency: int = 8,
+) -> list[UploadResult]:
+    """
+    Upload many documents to the planning store concurrently.
+
+    Resolves the store once and fans the uploads out under a bounded
+    semaphore, overlapping the HTTPS latency that a per-document
+    upload_to_planning_store loop would serialize.
+
+    Args:
+        api_key: Gemini API key
+        items: Dicts with content, display_name, and optionally
+            content_type ("markdown" or "pdf") and metadata
+        store_display_name: Display name of the File Search Store
+        concurrency: Max uploads in flight at once
+
+    Returns:
+        UploadResults in the same order as items (failures are returned
+        as unsuccessful results, not raised)
+    """
+    tool = _get_shared_tool(api_key)
+    store_name, _ = await tool.get_or_create_store(store_display_name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _upload_one(item: dict) -> UploadResult:
+        async with semaphore:
+            try:
+                content = item["content"]
+                display_name = item["display_name"]
+                metadata = item.get("metadata")
+                if item.get("content_type") == "pdf":
+                    if isinstance(content, str):
+                        content = content.encode("utf-8")
+                    return await tool.upload_pdf(
+                        store_name, content, display_name, metadata
+                    )
+                return await tool.upload_markdown(
+                    store_name, content, display_name, metadata
+                )
+            except Exception as e:
+                # Malformed items (missing content/display_name) become
+                # failed results so the gather never abandons siblings
+                return UploadResult(success=False, error=str(e))
+
+    return list(await asyncio.gather(*(_upload_one(item) for item in items)))
@@ -6,21 +6,76 @@ Free alternative to Firecrawl with no API costs.
 """
 
 import asyncio
+import hashlib
 import html2text
+import httpx
+import re
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page
-
-
-@dataclass
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+# Prefer trafilatura for HTML->markdown when installed: its C-backed
+# parse is an order of magnitude faster than html2text's pure-Python
+# tokenizer on large pages. Optional; html2text remains the fallback.
+try:
+    import trafilatura
+except ImportError:
+    trafilatura = None
+
+# Realistic user agent shared by every context we create
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Resource types that contribute nothing to markdown extraction
+BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
+
+# Candidate main-content selectors, most specific first. Kept as a
+# list (not a comma-joined selector) because querySelector on a joined
+# list honors document order, not our priority order.
+CONTENT_SELECTORS = [
+    "main",
+    "article",
+    "#content",
+    "#main-content",
+    ".content",
+    ".main-content",
+    "#bodyContent",
+    ".page-content",
+]
+
+# Markdown-cleanup patterns, compiled once. A "nav link" line is a
+# short (<50 chars stripped) line that is nothing but a markdown link —
+# the menu artifacts html2text leaves behind.
+_NAV_LINK_RE = re.compile(r"^[ \t]*\[[^\n]{0,47}\)[ \t]*$\n?", re.MULTILINE)
+_LEADING_BLANKS_RE = re.compile(r"\A(?:[ \t]*\n)+")
+_TRAILING_BLANKS_RE = re.compile(r"(?:\n[ \t]*)+\Z")
+
+# In-page predicate: true once no bot-challenge text is visible
+_NO_CHALLENGE_JS = (
+    "() => {"
+    "  const text = document.body ? document.body.innerText : '';"
+    "  return !text.includes('Verify you are human')"
+    "    && !text.toLowerCase().includes('checking your browser');"
+    "}"
+)
+
+
+@dataclass(slots=True)
 class ScrapeResult:
     """Result from scraping a URL."""
     url: str
     success: bool
     markdown: Optional[str] = None
     html: Optional[str] = None
+    pdf_bytes: Optional[bytes] = None
     title: Optional[str] = None
     error: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None  # filled when hashed during download
 
 
 class PlaywrightScraper:
@@ -31,30 +86,137 @@ class PlaywrightScraper:
     Converts HTML to markdown using html2text.
     """
 
-    def __init__(self):
-        """Initialize the scraper."""
+    # Max successful results kept in the in-memory LRU cache
+    CACHE_MAX_ENTRIES = 256
+
+    def __init__(self, recycle_every: int = 50):
+        """
+        Initialize the scraper.
+
+        Args:
+            recycle_every: Recreate the shared browser context after this
+                many pages to keep long runs from accumulating memory
+        """
         self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._pdf_context: Optional[BrowserContext] = None
         self._playwright = None
-        self._h2t = html2text.HTML2Text()
-        self._h2t.ignore_links = False
-        self._h2t.ignore_images = True
-        self._h2t.ignore_emphasis = False
-        self._h2t.body_width = 0  # Don't wrap lines
+        self._http: Optional[httpx.AsyncClient] = None
+        self._launch_lock = asyncio.Lock()
+        self._pages_served = 0
+        self._recycle_every = recycle_every
+        # Successful results only, LRU-evicted at CACHE_MAX_ENTRIES.
+        # Retries and reruns revisit the same URLs; a hit here skips
+        # the entire browser round-trip.
+        self._result_cache: OrderedDict[str, ScrapeResult] = OrderedDict()
 
     async def _ensure_browser(self) -> Browser:
-        """Ensure browser is launched."""
+        """Ensure browser is launched (once per scraper lifetime)."""
         if self._browser is None:
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=True,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                ]
-            )
+            async with self._launch_lock:
+                if self._browser is None:
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(
+                        headless=True,
+                        args=[
+                            "--disable-blink-features=AutomationControlled",
+                        ]
+                    )
         return self._browser
 
+    async def _new_shared_context(self, browser: Browser) -> BrowserContext:
+        """Create the shared context used for HTML page scrapes."""
+        context = await browser.new_context(
+            user_agent=USER_AGENT,
+            viewport={"width": 1920, "height": 1080},
+        )
+        # Block images/CSS/fonts/media — html2text discards them anyway,
+        # and skipping the downloads cuts page-load time and memory.
+        # The periodic context recycle above also bounds the known
+        # page.route memory growth on long runs.
+        await context.route(
+            "**/*",
+            lambda route: (
+                route.abort()
+                if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+                else route.continue_()
+            ),
+        )
+        return context
+
+    async def _new_page(self) -> Page:
+        """
+        Get a page from the shared context, recycling the context
+        periodically to dodge Playwright memory growth on long runs.
+        """
+        browser = await self._ensure_browser()
+        async with self._launch_lock:
+            if self._context is None:
+                self._context = await self._new_shared_context(browser)
+            elif self._pages_served >= self._recycle_every and not self._context.pages:
+                # Recycle only once the old context has drained: closing
+                # it with pages still open would kill sibling scrapes
+                # that scrape_many has in flight. Deferral is safe —
+                # every scrape closes its page in a finally, so a quiet
+                # moment always comes.
+                await self._context.close()
+                self._context = await self._new_shared_context(browser)
+                self._pages_served = 0
+            self._pages_served += 1
+            return await self._context.new_page()
+
+    async def _ensure_pdf_context(self) -> BrowserContext:
+        """
+        Ensure the dedicated PDF-download context exists.
+
+        PDFs need accept_downloads and must not share the HTML context's
+        resource blocking, but the context itself is reusable — creating
+        one per fallback download costs ~100ms each time.
+        """
+        browser = await self._ensure_browser()
+        async with self._launch_lock:
+            if self._pdf_context is None:
+                self._pdf_context = await browser.new_context(
+                    user_agent=USER_AGENT,
+                    accept_downloads=True,
+                )
+            return self._pdf_context
+
+    def _ensure_http(self) -> httpx.AsyncClient:
+        """Ensure the plain HTTP client (for PDF downloads) exists."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=60.0,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._http
+
+    def _cache_get(self, key: str) -> Optional[ScrapeResult]:
+        """Return a cached result and mark it most recently used."""
+        result = self._result_cache.get(key)
+        if result is not None:
+            self._result_cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: str, result: ScrapeResult) -> None:
+        """Store a successful result, evicting the least recently used."""
+        self._result_cache[key] = result
+        self._result_cache.move_to_end(key)
+        if len(self._result_cache) > self.CACHE_MAX_ENTRIES:
+            self._result_cache.popitem(last=False)
+
     async def close(self):
         """Close the browser and cleanup."""
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+        if self._context:
+            await self._context.close()
+            self._context = None
+        if self._pdf_context:
+            await self._pdf_context.close()
+            self._pdf_context = None
         if self._browser:
             await self._browser.close()
             self._browser = None
@@ -73,6 +235,7 @@ class PlaywrightScraper:
         url: str,
         wait_for_selector: Optional[str] = None,
         timeout: int = 60000,
+        include_html: bool = False,
     ) -> ScrapeResult:
         """
         Scrape an HTML page and convert to markdown.
@@ -81,34 +244,44 @@ class PlaywrightScraper:
             url: URL to scrape
             wait_for_selector: Optional CSS selector to wait for before scraping
             timeout: Page load timeout in milliseconds
+            include_html: Keep the raw HTML on the result (doubles peak
+                memory for large pages; off by default)
 
         Returns:
             ScrapeResult with markdown content
         """
+        cache_key = f"html:{url}|{wait_for_selector or ''}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            browser = await self._ensure_browser()
-            # Create page with realistic user agent
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-            )
-            page = await context.new_page()
+            page = await self._new_page()
 
             try:
                 # Navigate to page
-                await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-
-                # Wait for any bot challenges to complete (Cloudflare, etc.)
-                # Check if we're on a challenge page and wait
-                for _ in range(10):  # Up to 10 seconds
-                    content = await page.content()
-                    if "Verify you are human" in content or "checking your browser" in content.lower():
-                        await asyncio.sleep(1)
-                    else:
-                        break
+                response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+
+                # Capture cache validators for conditional re-checks
+                etag = response.headers.get("etag") if response else None
+                last_modified = response.headers.get("last-modified") if response else None
+
+                # Wait for any bot challenges (Cloudflare, etc.) to clear.
+                # The predicate runs in-page, so this avoids shipping up
+                # to ten full page.content() snapshots over the protocol.
+                try:
+                    await page.wait_for_function(
+                        _NO_CHALLENGE_JS, timeout=10000
+                    )
+                except Exception:
+                    pass  # challenge didn't clear — let validation catch it
 
-                # Wait additional time for dynamic content
-                await asyncio.sleep(2)
+                # Let in-flight requests settle instead of a fixed sleep;
+                # quiet pages proceed immediately, busy ones get 3s max
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=3000)
+                except Exception:
+                    pass  # still loading — extract whatever has rendered
 
                 # Wait for optional selector
                 if wait_for_selector:
@@ -117,38 +290,38 @@ class PlaywrightScraper:
                 # Get page title
                 title = await page.title()
 
-                # Get main content - try common content selectors
-                content_selectors = [
-                    "main",
-                    "article",
-                    "#content",
-                    "#main-content",
-                    ".content",
-                    ".main-content",
-                    "#bodyContent",
-                    ".page-content",
-                ]
-
-                html_content = None
-                for selector in content_selectors:
-                    try:
-                        element = await page.query_selector(selector)
-                        if element:
-                            html_content = await element.inner_html()
-                            break
-                    except Exception:
-                        continue
-
-                # Fallback to body if no content selector found
-                if not html_content:
-                    html_content = await page.content()
-                    # Try to extract just the body
-                    body = await page.query_selector("body")
-                    if body:
-                        html_content = await body.inner_html()
+                # Get main content - try CONTENT_SELECTORS in priority
+                # order inside one page.evaluate: a single protocol
+                # round-trip instead of one query_selector + inner_html
+                # pair per selector plus a body fallback
+                # Chrome and boilerplate subtrees are dropped in-page
+                # first, so they never reach the (slow, pure-Python)
+                # markdown converter at all
+                html_content = await page.evaluate(
+                    """(selectors) => {
+                        document
+                            .querySelectorAll(
+                                'nav,footer,script,style,aside,noscript,iframe'
+                            )
+                            .forEach((el) => el.remove());
+                        for (const sel of selectors) {
+                            const el = document.querySelector(sel);
+                            if (el) return el.innerHTML;
+                        }
+                        return document.body ? document.body.innerHTML : '';
+                    }""",
+                    CONTENT_SELECTORS,
+                )
 
-                # Convert HTML to markdown
-                markdown = self._h2t.handle(html_content)
+                # Convert HTML to markdown off the event loop — it's
+                # pure-Python CPU work that would otherwise stall every
+                # concurrent scrape — then release the (possibly
+                # multi-MB) HTML string unless the caller wants it
+                markdown = await asyncio.to_thread(
+                    self._html_to_markdown, html_content
+                )
+                if not include_html:
+                    html_content = None
 
                 # Clean up markdown
                 markdown = self._clean_markdown(markdown)
@@ -161,17 +334,20 @@ class PlaywrightScraper:
                         error="Scraped content too short or empty",
                     )
 
-                return ScrapeResult(
+                result = ScrapeResult(
                     url=url,
                     success=True,
                     markdown=markdown,
                     html=html_content,
                     title=title,
+                    etag=etag,
+                    last_modified=last_modified,
                 )
+                self._cache_put(cache_key, result)
+                return result
 
             finally:
                 await page.close()
-                await context.close()
 
         except Exception as e:
             return ScrapeResult(
@@ -180,9 +356,44 @@ class PlaywrightScraper:
                 error=str(e),
             )
 
+    async def scrape_many(
+        self,
+        urls: list[str],
+        wait_for_selector: Optional[str] = None,
+        concurrency: int = 8,
+    ) -> list[ScrapeResult]:
+        """
+        Scrape many pages concurrently on the shared browser.
+
+        Chromium comfortably runs many tabs per browser, so a bounded
+        semaphore overlaps the network waits a sequential loop would
+        serialize — browser startup is paid once either way.
+
+        Args:
+            urls: URLs to scrape
+            wait_for_selector: Optional CSS selector to wait for on
+                every page before scraping
+            concurrency: Max pages in flight at once
+
+        Returns:
+            ScrapeResults in the same order as urls (failures are
+            returned as unsuccessful results, not raised)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _scrape_one(url: str) -> ScrapeResult:
+            async with semaphore:
+                return await self.scrape_page(url, wait_for_selector)
+
+        return list(await asyncio.gather(*(_scrape_one(url) for url in urls)))
+
     async def scrape_pdf(self, url: str) -> ScrapeResult:
         """
-        Download a PDF using Playwright to bypass bot protection.
+        Download a PDF, preferring a plain HTTP GET over the browser.
+
+        A PDF fetch is just bytes over HTTPS — spinning up Chromium for it
+        is wasted work. Playwright is only used as a fallback when the
+        server answers with a bot challenge or an HTML interstitial page.
 
         Note: PDF text extraction is handled by Gemini File Search,
         so we just need to download the PDF content.
@@ -191,15 +402,81 @@ class PlaywrightScraper:
             url: URL of the PDF
 
         Returns:
-            ScrapeResult with PDF content as bytes in markdown field
+            ScrapeResult with PDF content in pdf_bytes
         """
+        cache_key = f"pdf:{url}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            browser = await self._ensure_browser()
-            # Create page with realistic user agent
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                accept_downloads=True,
+            needs_browser = False
+            async with self._ensure_http().stream("GET", url) as response:
+                content_type = response.headers.get("content-type", "")
+                if response.status_code in (403, 503) or "html" in content_type.lower():
+                    # Bot protection or interstitial page — needs a real browser
+                    needs_browser = True
+                else:
+                    response.raise_for_status()
+
+                    # Hash while the body streams in so the agent doesn't
+                    # need a second pass over the payload (digest params
+                    # must match convex_client.compute_content_hash)
+                    hasher = hashlib.blake2b(digest_size=16)
+                    buf = bytearray()
+                    async for chunk in response.aiter_bytes(65536):
+                        hasher.update(chunk)
+                        buf.extend(chunk)
+
+            if not needs_browser and not buf.startswith(b"%PDF"):
+                # Wrong magic bytes: an interstitial served with a
+                # permissive content-type — retry through the browser
+                needs_browser = True
+
+            if needs_browser:
+                result = await self._scrape_pdf_browser(url)
+                if result.success:
+                    self._cache_put(cache_key, result)
+                return result
+
+            if len(buf) <= 100:
+                return ScrapeResult(
+                    url=url,
+                    success=False,
+                    error="Downloaded PDF content too short or empty",
+                )
+
+            result = ScrapeResult(
+                url=url,
+                success=True,
+                pdf_bytes=bytes(buf),
+                title=url.split("/")[-1].replace(".pdf", ""),
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                content_hash=hasher.hexdigest(),
+            )
+            self._cache_put(cache_key, result)
+            return result
+
+        except Exception as e:
+            return ScrapeResult(
+                url=url,
+                success=False,
+                error=str(e),
             )
+
+    async def _scrape_pdf_browser(self, url: str) -> ScrapeResult:
+        """
+        Download a PDF using Playwright to bypass bot protection.
+
+        Args:
+            url: URL of the PDF
+
+        Returns:
+            ScrapeResult with PDF content in pdf_bytes
+        """
+        try:
+            context = await self._ensure_pdf_context()
             page = await context.new_page()
 
             try:
@@ -219,25 +496,28 @@ class PlaywrightScraper:
                 # Navigate to PDF URL
                 response = await page.goto(url, timeout=60000, wait_until="load")
 
-                # Wait a bit for any challenge pages
-                for _ in range(10):
-                    content = await page.content()
-                    if "Verify you are human" in content or "checking your browser" in content.lower():
-                        await asyncio.sleep(1)
-                    else:
-                        break
+                # Capture cache validators for conditional re-checks
+                etag = response.headers.get("etag") if response else None
+                last_modified = response.headers.get("last-modified") if response else None
+
+                # Wait for any challenge page to clear (in-page predicate,
+                # no repeated content snapshots)
+                try:
+                    await page.wait_for_function(
+                        _NO_CHALLENGE_JS, timeout=10000
+                    )
+                except Exception:
+                    pass
 
                 # If we captured the PDF from response handler, use that
                 if pdf_content and len(pdf_content) > 100:
-                    # Store PDF bytes as base64 in the result for later upload
-                    import base64
-                    pdf_base64 = base64.b64encode(pdf_content).decode("utf-8")
-
                     return ScrapeResult(
                         url=url,
                         success=True,
-                        markdown=f"PDF_BASE64:{pdf_base64}",  # Special marker for PDF content
+                        pdf_bytes=pdf_content,
                         title=url.split("/")[-1].replace(".pdf", ""),
+                        etag=etag,
+                        last_modified=last_modified,
                     )
 
                 # Fallback: try to get the response directly
@@ -245,13 +525,13 @@ class PlaywrightScraper:
                     try:
                         body = await response.body()
                         if body and len(body) > 100:
-                            import base64
-                            pdf_base64 = base64.b64encode(body).decode("utf-8")
                             return ScrapeResult(
                                 url=url,
                                 success=True,
-                                markdown=f"PDF_BASE64:{pdf_base64}",
+                                pdf_bytes=body,
                                 title=url.split("/")[-1].replace(".pdf", ""),
+                                etag=etag,
+                                last_modified=last_modified,
                             )
                     except Exception:
                         pass
@@ -263,8 +543,8 @@ class PlaywrightScraper:
                 )
 
             finally:
+                # Context stays alive for the next fallback download
                 await page.close()
-                await context.close()
 
         except Exception as e:
             return ScrapeResult(
@@ -273,26 +553,47 @@ class PlaywrightScraper:
                 error=str(e),
             )
 
+    @staticmethod
+    def _html_to_markdown(html_content: str) -> str:
+        """
+        Convert extracted HTML to markdown.
+
+        Runs inside asyncio.to_thread, so it builds a fresh HTML2Text
+        per call — the converter keeps per-document parse state and is
+        not safe to share across threads. Uses trafilatura's markdown
+        output when the package is installed, falling back to
+        html2text (trafilatura returns None for pages it can't
+        confidently extract, so the fallback also covers those).
+        """
+        if trafilatura is not None:
+            try:
+                markdown = trafilatura.extract(
+                    html_content,
+                    output_format="markdown",
+                    include_links=True,
+                )
+                if markdown:
+                    return markdown
+            except Exception:
+                pass  # fall through to html2text
+        h2t = html2text.HTML2Text()
+        h2t.ignore_links = False
+        h2t.ignore_images = True
+        h2t.ignore_emphasis = False
+        h2t.body_width = 0  # Don't wrap lines
+        return h2t.handle(html_content)
+
     def _clean_markdown(self, markdown: str) -> str:
-        """Clean up markdown content."""
-        lines = markdown.split("\n")
-        cleaned = []
-
-        for line in lines:
-            # Skip empty lines at start
-            if not cleaned and not line.strip():
-                continue
-            # Skip navigation/menu items (lines that are just links)
-            if line.strip().startswith("[") and line.strip().endswith(")"):
-                if len(line.strip()) < 50:  # Short link-only lines
-                    continue
-            cleaned.append(line)
-
-        # Remove trailing empty lines
-        while cleaned and not cleaned[-1].strip():
-            cleaned.pop()
-
-        return "\n".join(cleaned)
+        """
+        Clean up markdown content.
+
+        Three compiled-regex substitutions (drop nav-link lines, trim
+        blank edges) instead of a Python-level loop over every line —
+        the C regex engine does the scanning.
+        """
+        markdown = _NAV_LINK_RE.sub("", markdown)
+        markdown = _LEADING_BLANKS_RE.sub("", markdown)
+        return _TRAILING_BLANKS_RE.sub("", markdown)
 
 
 # Singleton instance for reuse